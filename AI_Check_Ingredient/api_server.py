@@ -5,15 +5,21 @@ Flask server that provides semantic search for ingredients using SentenceTransfo
 
 import os
 import json
+import queue
+import threading
+import time
 import unicodedata
 import re
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+
 import numpy as np
 import pandas as pd
+import torch
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
-from rapidfuzz import fuzz
+from rapidfuzz import fuzz, process as rf_process
 
 try:
     import faiss
@@ -21,6 +27,33 @@ try:
 except ImportError:
     FAISS_AVAILABLE = False
 
+try:
+    import pyarrow  # noqa: F401  (pandas parquet engine)
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+try:
+    from cachetools import TTLCache
+    CACHETOOLS_AVAILABLE = True
+except ImportError:
+    CACHETOOLS_AVAILABLE = False
+
+try:
+    from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from transformers import AutoTokenizer
+    from huggingface_hub import hf_hub_download
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
 app = Flask(__name__)
 CORS(app)  # Enable CORS for frontend
 
@@ -34,10 +67,18 @@ CARDS_PATH = os.path.join(DATA_DIR, "novel_foods_cards.csv")
 MULTIV_PATH = os.path.join(DATA_DIR, "novel_foods_multivectors.csv")
 MODEL_NAME = "sentence-transformers/distiluse-base-multilingual-cased-v2"
 
+# Encoder backend: opt in to ONNX Runtime with INT8 quantization by
+# setting AI_SEARCH_ONNX=1 (requires optimum); off by default until
+# output parity with the SentenceTransformer stack is demonstrated
+USE_ONNX = ONNX_AVAILABLE and os.environ.get("AI_SEARCH_ONNX", "0") == "1"
+ENCODER_BACKEND = "onnx-int8" if USE_ONNX else "torch"
+ONNX_DIR = os.path.join(CACHE_DIR, "onnx_int8")
+
 # Cache paths
 EMB_MULTI = os.path.join(CACHE_DIR, "emb_multi.npy")
 IDX_MULTI = os.path.join(CACHE_DIR, "index_multi.faiss")
 LOOKUP_MULTI = os.path.join(CACHE_DIR, "lookup_multi.csv")
+LOOKUP_PARQUET = os.path.join(CACHE_DIR, "lookup_multi.parquet")
 META_MULTI = os.path.join(CACHE_DIR, "meta_multi.json")
 
 # Search parameters
@@ -46,6 +87,19 @@ RECALL_K = 200
 ALPHA_SEM = 0.75
 MIN_CONFIDENCE = 0.50
 
+# FAISS index parameters
+IVF_MIN_ROWS = 10000  # below this, exhaustive flat search is fast enough
+NPROBE = 16
+SHARD_MIN_ROWS = 200000  # below this a single GEMV beats thread overhead
+FAISS_ADD_CHUNK = 8192
+
+# Query batching parameters
+BATCH_WINDOW_S = 0.005  # how long to wait for more queries to coalesce
+BATCH_MAX_SIZE = 32
+QUERY_CACHE_SIZE = 4096  # LRU entries for repeat-query embeddings
+RESULT_CACHE_SIZE = 8192  # full-result TTL cache entries
+RESULT_CACHE_TTL_S = 3600
+
 SECTION_BOOST = {
     "CANON_LAT": 1.05,
     "CANON_EN": 1.00,
@@ -57,6 +111,75 @@ model = None
 embeddings = None
 faiss_index = None
 lookup_df = None
+lookup_arrays = None  # plain NumPy columns for the hot scoring path
+query_batcher = None
+
+# search_ai is deterministic for a loaded index, so whole result lists
+# can be cached; TTL bounds staleness across reindexing
+if CACHETOOLS_AVAILABLE:
+    result_cache = TTLCache(maxsize=RESULT_CACHE_SIZE, ttl=RESULT_CACHE_TTL_S)
+else:
+    result_cache = None
+result_cache_lock = threading.Lock()
+
+
+class QueryBatcher:
+    """Coalesce concurrent query encodes into a single model.encode call.
+
+    Queries arriving within a short window are encoded together so the
+    transformer runs at batch size > 1 under concurrent load instead of
+    paying the full forward pass per request. Queries are sorted by
+    length before encoding (SBERT-style smart batching, so padding is
+    minimal) and each caller gets its own embedding back.
+    """
+
+    def __init__(self, encode_fn, window=BATCH_WINDOW_S, max_size=BATCH_MAX_SIZE):
+        self._encode = encode_fn
+        self._window = window
+        self._max_size = max_size
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def encode(self, query):
+        """Submit a query and block until its embedding is ready"""
+        future = Future()
+        self._queue.put((query, future))
+        return future.result()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self._window
+            while len(batch) < self._max_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+
+            order = sorted(range(len(batch)), key=lambda i: len(batch[i][0]))
+            try:
+                embs = self._encode([batch[i][0] for i in order])
+                for pos, i in enumerate(order):
+                    batch[i][1].set_result(embs[pos])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+
+# Precompiled pieces of normalize_query_lex: unicode dashes -> "-",
+# anything outside [a-z0-9 space - latin accents] -> space
+_DASH_RE = re.compile(r"[\u2212\u2010-\u2015]")
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9 \-\u00C0-\u017F]")
+_WS_RE = re.compile(r"\s+")
+# ASCII fast path: one translation table instead of regex substitution
+_ASCII_TR = str.maketrans({
+    chr(i): " " for i in range(128) if not (chr(i).isalnum() or chr(i) in " -")
+})
 
 
 def normalize_query_lex(s: str) -> str:
@@ -64,9 +187,12 @@ def normalize_query_lex(s: str) -> str:
     if not isinstance(s, str):
         return ""
     s = unicodedata.normalize("NFKC", s.casefold())
-    s = re.sub(r"[\u2212\u2010-\u2015]", "-", s)
-    s = re.sub(r"[^a-z0-9 \-\u00C0-\u017F]", " ", s)
-    s = re.sub(r"\s+", " ", s).strip()
+    if s.isascii():
+        s = s.translate(_ASCII_TR)
+    else:
+        s = _DASH_RE.sub("-", s)
+        s = _NON_ALNUM_RE.sub(" ", s)
+    s = _WS_RE.sub(" ", s).strip()
     return s
 
 
@@ -79,6 +205,120 @@ def section_boost(section: str) -> float:
     return 1.00
 
 
+class OnnxEncoder:
+    """SentenceTransformer-compatible encoder backed by ONNX Runtime.
+
+    Exports the underlying HuggingFace transformer to ONNX, applies
+    dynamic INT8 quantization (AVX512-VNNI config) and reproduces the
+    SBERT pipeline: attention-masked mean pooling, the model's Dense
+    projection head (768 -> 512 with tanh for distiluse, which the plain
+    transformer export drops), then L2 normalization. Only the .encode
+    interface used by this server is implemented.
+    """
+
+    def __init__(self, model_name, cache_dir=ONNX_DIR):
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        quant_file = "model_quantized.onnx"
+        if not os.path.exists(os.path.join(cache_dir, quant_file)):
+            print("⚙️ Exporting model to ONNX + INT8 (one-time)...")
+            ort_model = ORTModelForFeatureExtraction.from_pretrained(model_name, export=True)
+            quantizer = ORTQuantizer.from_pretrained(ort_model)
+            quantizer.quantize(
+                save_dir=cache_dir,
+                quantization_config=AutoQuantizationConfig.avx512_vnni(is_static=False),
+            )
+        self.model = ORTModelForFeatureExtraction.from_pretrained(cache_dir, file_name=quant_file)
+        self._dense_w, self._dense_b = self._load_dense_weights(model_name)
+
+    @staticmethod
+    def _load_dense_weights(model_name):
+        """Fetch the sentence-transformers Dense head (2_Dense module)"""
+        try:
+            path = hf_hub_download(model_name, "2_Dense/model.safetensors")
+            from safetensors.numpy import load_file
+            state = load_file(path)
+        except Exception:
+            path = hf_hub_download(model_name, "2_Dense/pytorch_model.bin")
+            state = {k: v.numpy() for k, v in torch.load(path, map_location="cpu").items()}
+        return (np.asarray(state["linear.weight"], dtype=np.float32),
+                np.asarray(state["linear.bias"], dtype=np.float32))
+
+    def encode(self, texts, batch_size=32, normalize_embeddings=True,
+               convert_to_numpy=True, show_progress_bar=False):
+        """Encode texts to embeddings (mean-pooled, L2-normalized)"""
+        chunks = []
+        for start in range(0, len(texts), batch_size):
+            enc = self.tokenizer(
+                texts[start:start + batch_size],
+                padding=True, truncation=True, return_tensors="np",
+            )
+            hidden = self.model(**enc).last_hidden_state
+            mask = enc["attention_mask"][:, :, None].astype(hidden.dtype)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            # Dense head: same projection + tanh the torch stack applies
+            chunks.append(np.tanh(pooled @ self._dense_w.T + self._dense_b))
+        emb = np.concatenate(chunks, axis=0)
+        if normalize_embeddings:
+            emb /= np.clip(np.linalg.norm(emb, axis=1, keepdims=True), 1e-12, None)
+        return emb.astype(np.float32)
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, cache=True)
+    def blend_scores(sem, boosts, lex, alpha):
+        """Fused section-boost + semantic/lexical blend over the candidates"""
+        out = np.empty_like(sem)
+        for i in prange(len(sem)):
+            out[i] = alpha * sem[i] * boosts[i] + (1.0 - alpha) * lex[i]
+        return out
+else:
+    def blend_scores(sem, boosts, lex, alpha):
+        """NumPy fallback for the fused blend when numba is missing"""
+        return alpha * sem * boosts + (1.0 - alpha) * lex
+
+
+def build_faiss_index(emb):
+    """Build a FAISS index sized to the corpus.
+
+    Small corpora keep the exhaustive IndexFlatIP. Larger ones get an
+    IVF-PQ index: the coarse quantizer limits each query to a few probed
+    centroids instead of all N vectors, and product quantization shrinks
+    the resident footprint. Vectors are added in fp32 chunks so a
+    memmapped fp16 matrix never fully materializes in RAM.
+    """
+    n, d = emb.shape
+
+    if n < IVF_MIN_ROWS:
+        index = faiss.IndexFlatIP(d)
+    else:
+        nlist = int(4 * np.sqrt(n))
+        m = d // 4  # PQ sub-quantizers (d=512 for distiluse -> 128)
+        index = faiss.index_factory(d, f"IVF{nlist},PQ{m}x8", faiss.METRIC_INNER_PRODUCT)
+        index.train(np.asarray(emb, dtype=np.float32))  # transient fp32 copy
+        index.nprobe = NPROBE
+
+    for start in range(0, n, FAISS_ADD_CHUNK):
+        index.add(np.asarray(emb[start:start + FAISS_ADD_CHUNK], dtype=np.float32))
+    return index
+
+
+def maybe_index_to_gpu(index):
+    """Move a FAISS index to GPU 0 when a device is visible.
+
+    GPU flat search runs as a batched GEMM and vastly outpaces the CPU
+    path on large corpora. faiss-cpu builds have no GPU symbols, so
+    everything is feature-checked and the CPU index is kept on failure.
+    """
+    if getattr(faiss, "get_num_gpus", lambda: 0)() > 0:
+        try:
+            res = faiss.StandardGpuResources()
+            index = faiss.index_cpu_to_gpu(res, 0, index)
+            print("✅ FAISS index moved to GPU.")
+        except Exception as e:
+            print(f"⚠️ FAISS GPU transfer failed: {e}. Staying on CPU.")
+    return index
+
+
 def load_multivectors():
     """Load multivector data"""
     mv = pd.read_csv(MULTIV_PATH, dtype={"policy_item_id": str})
@@ -91,16 +331,178 @@ def load_multivectors():
         can_map = pd.DataFrame(columns=["policy_item_id", "canonical"])
 
     lookup = mv.merge(can_map, on="policy_item_id", how="left")
+    add_normalized_columns(lookup)
     return mv, lookup
 
 
+def save_lookup_cache(lookup):
+    """Persist the lookup table, preferring Parquet over CSV.
+
+    Parquet parses far faster at startup and dictionary-encodes the
+    low-cardinality section/language columns.
+    """
+    if PARQUET_AVAILABLE:
+        out = lookup.copy()
+        for col in ("section", "language"):
+            out[col] = out[col].astype("category")
+        out.to_parquet(LOOKUP_PARQUET, index=False)
+    else:
+        lookup.to_csv(LOOKUP_MULTI, index=False)
+
+
+def load_lookup_cache():
+    """Load the cached lookup table (Parquet if present, else CSV)"""
+    if PARQUET_AVAILABLE and os.path.exists(LOOKUP_PARQUET):
+        lookup = pd.read_parquet(LOOKUP_PARQUET)
+        lookup["policy_item_id"] = lookup["policy_item_id"].astype(str)
+        return lookup
+    return pd.read_csv(LOOKUP_MULTI, dtype={"policy_item_id": str})
+
+
+def build_lookup_arrays(lookup):
+    """Materialize lookup columns as plain NumPy arrays.
+
+    pandas .iloc is far too slow for per-candidate access inside the
+    scoring loop; plain arrays index in nanoseconds and the section
+    boost collapses to a float32 array built once.
+    """
+    return {
+        "pid": lookup["policy_item_id"].astype(str).to_numpy(dtype=object),
+        "text": lookup["text"].astype(str).to_numpy(dtype=object),
+        "canon": lookup["canonical"].fillna("").astype(str).to_numpy(dtype=object),
+        "section": lookup["section"].astype(str).to_numpy(dtype=object),
+        "lang": lookup["language"].astype(str).to_numpy(dtype=object),
+        "text_norm": lookup["text_norm"].astype(str).to_numpy(dtype=object),
+        "canon_norm": lookup["canon_norm"].astype(str).to_numpy(dtype=object),
+        "boost": np.array(
+            [section_boost(s) for s in lookup["section"].astype(str)],
+            dtype=np.float32,
+        ),
+    }
+
+
+def add_normalized_columns(lookup):
+    """Precompute normalized lex-forms so the request path never runs
+    normalize_query_lex over candidates"""
+    lookup["text_norm"] = lookup["text"].astype(str).map(normalize_query_lex)
+    lookup["canon_norm"] = lookup["canonical"].fillna("").astype(str).map(normalize_query_lex)
+
+
+def sharded_topk(q, k):
+    """Parallel top-k dot-product search over embedding row-blocks.
+
+    A single-query matmul over the flat matrix runs on one thread;
+    splitting the matrix into per-core blocks lets NumPy release the
+    GIL inside each dot product, so the blocks really run in parallel.
+    Each block returns a local top-k and the small union is merged.
+    """
+    workers = min(os.cpu_count() or 1, 8)
+    bounds = np.linspace(0, len(embeddings), workers + 1, dtype=int)
+
+    def block_topk(lo, hi):
+        sims = embeddings[lo:hi] @ q
+        if k < len(sims):
+            top = np.argpartition(-sims, k)[:k]
+        else:
+            top = np.arange(len(sims))
+        return top + lo, sims[top]
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        parts = list(pool.map(lambda b: block_topk(*b), zip(bounds[:-1], bounds[1:])))
+
+    cand_idx = np.concatenate([p[0] for p in parts])
+    cand_sims = np.concatenate([p[1] for p in parts])
+    order = np.argsort(-cand_sims)[:k]  # at most workers*k entries
+    return cand_idx[order], cand_sims[order]
+
+
+def _encode_texts(texts, show_progress_bar=False):
+    """Encode texts with the active backend, autograd machinery off.
+
+    inference_mode is cheaper than no_grad and a no-op for the ONNX
+    backend; all encodes (corpus build, batcher, warm-up) go through
+    here so the settings stay in one place.
+    """
+    with torch.inference_mode():
+        return model.encode(
+            texts,
+            batch_size=BATCH_MAX_SIZE,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=show_progress_bar,
+        )
+
+
+@lru_cache(maxsize=QUERY_CACHE_SIZE)
+def _encode_query_cached(q_norm):
+    """Embedding bytes for a normalized query.
+
+    Repeat queries skip the transformer entirely. Stored as bytes since
+    lru_cache values should be immutable; keyed on the normalized form
+    so trivial case/punctuation variants share one entry.
+    """
+    emb = query_batcher.encode(q_norm)
+    return np.asarray(emb, dtype=np.float32).tobytes()
+
+
+def encode_query(query):
+    """Encode a single query, serving repeats from the LRU cache"""
+    q_norm = normalize_query_lex(query)
+    buf = _encode_query_cached(q_norm or query)
+    return np.frombuffer(buf, dtype=np.float32).reshape(1, -1)
+
+
+def warm_up_encoder():
+    """Run a few throwaway encodes so the first request doesn't pay the
+    kernel/JIT initialization cost"""
+    print("🔥 Warming up encoder...")
+    for _ in range(3):
+        _encode_texts(["warm-up query"])
+    if not USE_ONNX and torch.cuda.is_available():
+        torch.cuda.synchronize()
+
+
 def initialize_model():
     """Initialize the AI model and load/build embeddings"""
-    global model, embeddings, faiss_index, lookup_df
+    global model, embeddings, faiss_index, lookup_df, lookup_arrays, query_batcher
 
     print("🚀 Initializing AI Search Model...")
-    print(f"⚙️ Loading model: {MODEL_NAME}")
-    model = SentenceTransformer(MODEL_NAME)
+
+    # Pin CPU threading before any model work: the defaults either
+    # oversubscribe or leave cores idle depending on the host
+    torch.set_num_threads(min(8, os.cpu_count() or 1))
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass  # can only be set once per process
+    if torch.backends.mkldnn.is_available():
+        torch.backends.mkldnn.enabled = True  # oneDNN AVX-512/VNNI kernels
+
+    print(f"⚙️ Loading model: {MODEL_NAME} ({ENCODER_BACKEND})")
+    if USE_ONNX:
+        model = OnnxEncoder(MODEL_NAME)
+    else:
+        model = SentenceTransformer(MODEL_NAME)
+        model.eval()
+        if torch.cuda.is_available():
+            # fp16 halves GPU inference cost; encode re-normalizes the
+            # outputs so the cosine scores stay comparable
+            model.half()
+        if hasattr(torch, "compile"):
+            try:
+                # Fuse the transformer's small ops; warm-up triggers the
+                # actual compilation, dynamic=True avoids per-length recompiles
+                model[0].auto_model = torch.compile(
+                    model[0].auto_model, mode="reduce-overhead", dynamic=True
+                )
+                print("✅ torch.compile enabled.")
+            except Exception as e:
+                print(f"⚠️ torch.compile unavailable: {e}")
+    query_batcher = QueryBatcher(_encode_texts)
+    _encode_query_cached.cache_clear()  # stale if the model was reloaded
+    if result_cache is not None:
+        with result_cache_lock:
+            result_cache.clear()
 
     mv, lookup = load_multivectors()
     texts = mv["text"].astype(str).tolist()
@@ -108,7 +510,7 @@ def initialize_model():
     # Check if we can use cached embeddings
     use_cache = (
         os.path.exists(EMB_MULTI) and
-        os.path.exists(LOOKUP_MULTI) and
+        (os.path.exists(LOOKUP_PARQUET) or os.path.exists(LOOKUP_MULTI)) and
         os.path.exists(META_MULTI)
     )
 
@@ -116,17 +518,29 @@ def initialize_model():
         try:
             with open(META_MULTI, "r", encoding="utf-8") as f:
                 meta = json.load(f)
-            if meta.get("row_count") == len(texts) and meta.get("model") == MODEL_NAME:
+            if (meta.get("row_count") == len(texts) and
+                    meta.get("model") == MODEL_NAME and
+                    meta.get("backend", "torch") == ENCODER_BACKEND):
                 print("🔁 Loading cached embeddings...")
-                embeddings = np.load(EMB_MULTI)
-                lookup_df = pd.read_csv(LOOKUP_MULTI, dtype={"policy_item_id": str})
+                # Memory-map the matrix: the OS pages in only what the
+                # fallback search actually touches
+                embeddings = np.load(EMB_MULTI, mmap_mode="r")
+                lookup_df = load_lookup_cache()
+                if "text_norm" not in lookup_df.columns:
+                    # Cache written before normalized columns existed
+                    add_normalized_columns(lookup_df)
+                lookup_arrays = build_lookup_arrays(lookup_df)
 
                 if FAISS_AVAILABLE and os.path.exists(IDX_MULTI):
                     faiss_index = faiss.read_index(IDX_MULTI)
+                    if hasattr(faiss_index, "nprobe"):
+                        faiss_index.nprobe = NPROBE
+                    faiss_index = maybe_index_to_gpu(faiss_index)
                     print("✅ FAISS index loaded.")
                 else:
                     print("⚠️ FAISS not available, using cosine similarity.")
 
+                warm_up_encoder()
                 print(f"✅ Model initialized with {len(texts)} embeddings")
                 return
         except Exception as e:
@@ -134,23 +548,29 @@ def initialize_model():
 
     # Build embeddings
     print(f"⚙️ Building embeddings for {len(texts)} texts...")
-    embeddings = model.encode(texts, show_progress_bar=True, normalize_embeddings=True)
+    embeddings = _encode_texts(texts, show_progress_bar=True)
+
+    # Keep fp16 in RAM and on disk (L2-normalized values fit easily);
+    # FAISS gets a transient fp32 copy when the index is built
+    embeddings = np.asarray(embeddings, dtype=np.float16)
 
     # Save cache
     np.save(EMB_MULTI, embeddings)
-    lookup.to_csv(LOOKUP_MULTI, index=False)
+    save_lookup_cache(lookup)
     with open(META_MULTI, "w", encoding="utf-8") as f:
-        json.dump({"model": MODEL_NAME, "row_count": len(texts)}, f)
+        json.dump({"model": MODEL_NAME, "row_count": len(texts), "backend": ENCODER_BACKEND}, f)
 
     if FAISS_AVAILABLE:
-        faiss_index = faiss.IndexFlatIP(embeddings.shape[1])
-        faiss_index.add(np.array(embeddings, dtype="float32"))
-        faiss.write_index(faiss_index, IDX_MULTI)
+        faiss_index = build_faiss_index(embeddings)
+        faiss.write_index(faiss_index, IDX_MULTI)  # persist before GPU move
+        faiss_index = maybe_index_to_gpu(faiss_index)
         print("✅ FAISS index built and saved.")
     else:
         print("⚠️ FAISS not installed, using cosine similarity.")
 
     lookup_df = lookup
+    lookup_arrays = build_lookup_arrays(lookup_df)
+    warm_up_encoder()
     print(f"✅ Model initialized with {len(texts)} embeddings")
 
 
@@ -159,8 +579,8 @@ def search_ai(query: str, top_k: int = TOP_K_DEFAULT):
     if model is None or embeddings is None or lookup_df is None:
         raise RuntimeError("Model not initialized")
 
-    # Encode query
-    q_emb = model.encode([query], normalize_embeddings=True)
+    # Encode query (LRU-cached; cold queries batch with concurrent ones)
+    q_emb = encode_query(query)
 
     # Get candidates using FAISS or cosine similarity
     if FAISS_AVAILABLE and faiss_index is not None:
@@ -169,53 +589,74 @@ def search_ai(query: str, top_k: int = TOP_K_DEFAULT):
             min(RECALL_K, len(lookup_df))
         )
         idx, scores = idx[0], scores[0]
+        # IVF indices pad with -1 when the probed lists hold < k vectors
+        valid = idx >= 0
+        idx, scores = idx[valid], scores[valid]
     else:
-        sims = cosine_similarity(q_emb, embeddings)[0]
-        idx = np.argsort(sims)[::-1][:min(RECALL_K, len(lookup_df))]
-        scores = sims[idx]
-
-    # Blend semantic and lexical scores
+        # Embeddings are already L2-normalized, so cosine similarity is
+        # a plain dot product: one BLAS GEMV, no norm recomputation
+        k = min(RECALL_K, len(lookup_df))
+        q = q_emb[0].astype(embeddings.dtype)
+        if len(embeddings) >= SHARD_MIN_ROWS:
+            # Big flat corpus: shard rows across cores for one query
+            idx, scores = sharded_topk(q, k)
+            scores = scores.astype(np.float32)
+        else:
+            sims = embeddings @ q
+            if k < len(sims):
+                # O(N) partition for the top-k, then sort only those k
+                top = np.argpartition(-sims, k)[:k]
+            else:
+                top = np.arange(len(sims))
+            idx = top[np.argsort(-sims[top])]
+            scores = sims[idx].astype(np.float32)
+
+    arr = lookup_arrays
+
+    # Keep only the best semantic hit per entity before lexical scoring;
+    # FAISS returns candidates by descending score, so the first row per
+    # policy_item_id is the one the aggregation would keep anyway
+    _, first_seen = np.unique(arr["pid"][idx], return_index=True)
+    keep = np.sort(first_seen)
+    idx, scores = idx[keep], scores[keep]
+
+    # Blend semantic and lexical scores (vectorized over the candidates)
     q_norm = normalize_query_lex(query)
-    hits = []
-
-    for i, sem_score in zip(idx, scores):
-        row = lookup_df.iloc[i]
-        text = str(row.get("text", ""))
-        canon = str(row.get("canonical", ""))
-        section = str(row.get("section", ""))
-        lang = str(row.get("language", ""))
-
-        # Lexical matching
-        lex1 = fuzz.token_set_ratio(q_norm, normalize_query_lex(text)) / 100
-        lex2 = fuzz.token_set_ratio(q_norm, normalize_query_lex(canon)) / 100 if canon else 0.0
-        lex = max(lex1, lex2)
+    conf_threshold = MIN_CONFIDENCE * 100  # Convert to percentage
+
+    # Lexical matching in one C-level batch instead of 2 calls per row
+    lex1 = rf_process.cdist([q_norm], arr["text_norm"][idx],
+                            scorer=fuzz.token_set_ratio, workers=-1)[0] / 100.0
+    lex2 = rf_process.cdist([q_norm], arr["canon_norm"][idx],
+                            scorer=fuzz.token_set_ratio, workers=-1)[0] / 100.0
+    lex_scores = np.maximum(lex1, lex2)
+
+    final_scores = blend_scores(
+        np.ascontiguousarray(scores, dtype=np.float32),
+        arr["boost"][idx],
+        lex_scores.astype(np.float32),
+        ALPHA_SEM,
+    )
 
-        # Apply section boost
-        boosted_sem = float(sem_score) * section_boost(section)
-        final_score = ALPHA_SEM * boosted_sem + (1 - ALPHA_SEM) * lex
+    hits = []
+    for pos, i in enumerate(idx):
+        confidence = round(float(final_scores[pos]) * 100, 1)  # Convert to percentage
+        if confidence < conf_threshold:
+            continue
 
         hits.append({
-            "policy_item_id": str(row["policy_item_id"]),
-            "canonical": canon,
-            "matched_text": text,
-            "section": section,
-            "language": lang,
-            "semantic_score": round(float(sem_score), 3),
-            "lexical_score": round(lex, 3),
-            "confidence": round(final_score * 100, 1),  # Convert to percentage
+            "policy_item_id": arr["pid"][i],
+            "canonical": arr["canon"][i],
+            "matched_text": arr["text"][i],
+            "section": arr["section"][i],
+            "language": arr["lang"][i],
+            "semantic_score": round(float(scores[pos]), 3),
+            "lexical_score": round(float(lex_scores[pos]), 3),
+            "confidence": confidence,
         })
 
-    # Aggregate by entity (keep best per entity)
-    best_by_entity = {}
-    for h in hits:
-        pid = h["policy_item_id"]
-        conf_threshold = MIN_CONFIDENCE * 100  # Convert to percentage
-        if (pid not in best_by_entity) or (h["confidence"] > best_by_entity[pid]["confidence"]):
-            if h["confidence"] >= conf_threshold:
-                best_by_entity[pid] = h
-
-    # Sort by confidence
-    results = sorted(best_by_entity.values(), key=lambda x: x["confidence"], reverse=True)
+    # Candidates are already unique per entity; sort by confidence
+    results = sorted(hits, key=lambda x: x["confidence"], reverse=True)
     return results[:top_k]
 
 
@@ -263,8 +704,25 @@ def search_endpoint():
         if not query:
             return jsonify({"error": "Query parameter is required"}), 400
 
+        # Mirror encode_query's fallback: non-Latin queries normalize to
+        # "", so the raw query keeps their cache keys distinct
+        cache_key = (normalize_query_lex(query) or query, top_k)
+        if result_cache is not None:
+            with result_cache_lock:
+                cached = result_cache.get(cache_key)
+            if cached is not None:
+                return jsonify({
+                    "query": query,
+                    "results": cached,
+                    "count": len(cached)
+                })
+
         results = search_ai(query, top_k)
 
+        if result_cache is not None:
+            with result_cache_lock:
+                result_cache[cache_key] = results
+
         return jsonify({
             "query": query,
             "results": results,